@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import functools
 import os
 import socket
 import ssl
@@ -9,8 +10,11 @@ import argparse
 import daemon
 import logging
 import logging.handlers
+import queue
 import re
+import threading
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 
 from defaults import config as default_config
@@ -19,6 +23,19 @@ from validators import validate_config
 
 config = SimpleNamespace(**default_config)
 
+# Use the libyaml C loader when available (parses 5-10x faster), falling
+# back to the pure Python safe loader
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Pool of worker threads that serve the accepted connections, so that a slow
+# client or an iptables call does not block the accept loop.
+EXECUTOR = ThreadPoolExecutor(max_workers=max(4, (os.cpu_count() or 1) * 2))
+
+# iptables-restore payloads pending to be applied. A single worker thread
+# drains the queue, so clients get their reply without waiting for the
+# fork+exec and concurrent requests coalesce into one iptables-restore run.
+RULE_QUEUE = queue.Queue()
+
 
 def debug(message):
     """
@@ -59,38 +76,123 @@ def generate_iptables_command(ip_address, port, protocol, action):
     
     return command
 
-def open_ports(ip_address, ports=[]):
+def generate_iptables_rules(ports_list=[], action="add"):
+    """
+    Builds the iptables-restore payload template that adds (or removes)
+    one rule per entry of the PORTS config list.
+
+    Only the source IP address varies per request, so it is left as an
+    {ip} placeholder to be filled in when a command arrives.
     """
-    Opens the ports calling iptables
+    flag = '-A' if action == "add" else '-D'
+    lines = ["*filter"]
+    for port_info in ports_list:
+        lines.append(f"{flag} INPUT -p {port_info['protocol']} -s {{ip}} --dport {port_info['port']} -j ACCEPT")
+    lines.append("COMMIT")
+    return "\n".join(lines) + "\n"
+
+
+def precompute_rule_templates(config):
+    """
+    Partially evaluates the iptables-restore payloads at config load time.
+    Everything except the client IP address is fixed by config.PORTS, so
+    the templates are built once instead of on every connection.
+    """
+    ports_list = getattr(config, 'PORTS', [])
+    config.ADD_RULES_TEMPLATE = generate_iptables_rules(ports_list, action="add")
+    config.DEL_RULES_TEMPLATE = generate_iptables_rules(ports_list, action="remove")
+
 
-    ports an array of ports
+def _rule_worker():
     """
-    # Add a rule to iptables to allow incoming connections from the specified IP address
-    for port in ports:
-        # we open both
-        open_tcp_port = ['iptables', '-A', 'INPUT', '-p', 'tcp', '-s', ip_address, '--dport', str(port), '-j', 'ACCEPT']
-        open_udp_port = ['iptables', '-A', 'INPUT', '-p', 'udp', '-s', ip_address, '--dport', str(port), '-j', 'ACCEPT']
-        if config.DEBUG:
-            open_tcp_port_s = ' '.join(open_tcp_port)
-            open_udp_port_s = ' '.join(open_udp_port)
-            debug(open_tcp_port_s)
-            debug(open_udp_port_s)
-        else:
-            subprocess.run(open_tcp_port)
-            subprocess.run(open_udp_port)
-
-
-def close_ports(ip_address, ports=[]): 
+    Drains RULE_QUEUE, coalescing the pending payloads (up to 64 per
+    round) into a single iptables-restore invocation.
     """
-    Closes the ports
+    while True:
+        batch = [RULE_QUEUE.get()]
+        try:
+            while len(batch) < 64:
+                batch.append(RULE_QUEUE.get_nowait())
+        except queue.Empty:
+            pass
+        rules = "".join(batch)
+        try:
+            # close_fds=False lets subprocess take its posix_spawn fast
+            # path (vfork, no copy-on-write of the interpreter's pages)
+            subprocess.run(["iptables-restore", "--noflush"], input=rules.encode(),
+                           check=True, close_fds=False)
+        except Exception as e:
+            logger.error("iptables-restore failed: %s", e)
+        finally:
+            for _ in batch:
+                RULE_QUEUE.task_done()
+
+
+def open_ports(ip_address):
+    """
+    Opens the configured ports for ip_address, enqueueing the rules for
+    the iptables worker thread
+    """
+    # The worker applies the whole payload with one iptables-restore run,
+    # instead of one fork+exec of iptables per rule, and without keeping
+    # the client waiting for it.
+    rules = config.ADD_RULES_TEMPLATE.format(ip=ip_address)
+    if config.DEBUG:
+        debug(rules)
+    else:
+        RULE_QUEUE.put(rules)
+
+
+def close_ports(ip_address):
+    """
+    Closes the configured ports for ip_address, enqueueing the rules for
+    the iptables worker thread
     """
     debug(f"Close ports {ip_address}")
+    rules = config.DEL_RULES_TEMPLATE.format(ip=ip_address)
+    if config.DEBUG:
+        debug(rules)
+    else:
+        RULE_QUEUE.put(rules)
+
+
+# Templates for the default config. main() rebuilds them once the user
+# config has been merged and validated.
+precompute_rule_templates(config)
+
+
+# Reply byte strings, encoded once instead of on every connection
+_OK = b"OK"
+_KO = b"KO"
+
+# Command dispatch table: verb -> handler that receives the target IP address
+_DISPATCH = {
+    b"OPEN": open_ports,
+    b"MEOPEN": close_ports,
+}
+
+# The whole protocol fits in one pattern: verb plus optional argument,
+# matched with a single C-level scan of the (tiny) buffer.
+_CMD_RE = re.compile(rb'(OPEN|MEOPEN)(?: ((?:\d{1,3}\.){3}\d{1,3}|ME))?')
 
 
 def handle_client_connection(conn, addr):
     # Receive data from the client
     debug(f"Connection received from {addr[0]}")
-    data = conn.recv(1024).decode().strip()
+    # Disable Nagle so the tiny OK/KO replies are not delayed
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # Keep the buffer as bytes: the commands are plain ASCII, so there is
+    # no reason to pay for a decode and a str copy on every connection.
+    # The longest valid command is "MEOPEN 255.255.255.255" (22 bytes);
+    # read with some headroom and reject anything longer outright so
+    # oversized junk is cheap to dismiss.
+    data = conn.recv(64)
+    if len(data) > 32:
+        logger.error("Oversized command from ip_address %s", addr[0])
+        conn.sendall(_KO)
+        conn.close()
+        return
+    data = data.strip()
     # Valid commands
     #
     # OPEN ME
@@ -98,90 +200,123 @@ def handle_client_connection(conn, addr):
     # MEOPEN
     # MEOPEN <IPv4 address>    # Example MEOPEN 10.1.1.0
     #
-    if data == "OPEN ME":
-        # Get the IP address of the connecting client
-        ip_address = addr[0]
-        open_ports(ip_address)
-
-    elif data.startswith("OPEN "):
-        # Extract the IP address from the command
-        ip_address = data[5:].strip()
-        # Validate the IP address format (IPv4)
-        if not is_valid_ip4_address(ip_address):
-            # Log an error message for invalid IP address format
-            logger.error(f"Invalid IP address format: {ip_address}")
-            # Close the connection
-            conn.sendall("KO".encode())
-            conn.close()
-            return
-        open_ports(ip_address)
+    # Match the command in one pass and dispatch on the captured verb
+    match = _CMD_RE.fullmatch(data)
+    if match is None:
+        # Log an error message for unknown command
+        logger.error("Unknown command from ip_address %s data: %s", addr[0], data)
+        conn.sendall(_KO)
+        # Close the connection
+        conn.close()
+        return
 
-    elif data == "MEOPEN":
-        debug("MEOPEN")
+    handler = _DISPATCH[match.group(1)]
+    arg = match.group(2)
+    if arg in (None, b'ME'):
+        # No explicit IP, act on the address of the connecting client
         ip_address = addr[0]
-        close_ports(ip_address)
-    
-    elif data.startswith("MEOPEN "):
-        debug("MEOPEN IP")
-        # Extract the IP address from the command
-        ip_address = data[7:].strip()
-        # Validate the IP address format (IPv4)
+    else:
+        # The pattern only checks the shape; the octet ranges still go
+        # through the validator (the match guarantees ASCII digits)
+        ip_address = arg.decode('ascii')
         if not is_valid_ip4_address(ip_address):
             # Log an error message for invalid IP address format
-            logger.error(f"Invalid IP address format: {ip_address}")
+            logger.error("Invalid IP address format: %s", arg)
             # Close the connection
-            conn.sendall("KO".encode())
+            conn.sendall(_KO)
             conn.close()
             return
-        close_ports(ip_address)
-    else:
-        # Log an error message for unknown command
-        logger.error(f"Unknown command from ip_address {addr[0]} data: {data}")
-        conn.sendall("KO".encode())
-        # Close the connection
-        conn.close()
-        return
+
+    handler(ip_address)
 
     # Log a confirmation message
-    logger.info(f"openmed: Ports opened for {ip_address}")
-    conn.sendall("OK".encode())
+    logger.info("openmed: Ports opened for %s", ip_address)
+    conn.sendall(_OK)
     # Close the connection
     conn.close()
 
 
-def start_listening(config):
-    """Opens the listening port and starts 
-    For more info: see mai(), defaults.py, and config.yaml
-    Args:
-        config (config): An openme config object that holds info such as port number, binding addres, certificate file paths...
+@functools.lru_cache(maxsize=4)
+def _build_ssl_context(cert_file, key_file, ca_cert_file):
+    """Builds the server side SSL context.
+
+    Cached because parsing the certificate files is expensive and they do
+    not change while the daemon is running.
     """
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+
+    # TLS 1.3 only: it issues session tickets automatically, so returning
+    # clients (the usual case for a knock daemon) resume with a symmetric
+    # handshake instead of redoing the asymmetric crypto.
+    ssl_context.minimum_version = ssl.TLSVersion.TLSv1_3
+
+    ssl_context.load_cert_chain(certfile=cert_file, keyfile=key_file)
+
+    # Set the CA certificate file for client certificate verification
+    ssl_context.verify_mode = ssl.CERT_REQUIRED
+    ssl_context.load_verify_locations(cafile=ca_cert_file)
+    return ssl_context
+
+
+def _accept_loop(config, ssl_context):
+    """Accept loop of one listener thread.
 
+    Each listener owns its listening socket, bound with SO_REUSEPORT when
+    available, so the kernel spreads incoming connections across the
+    listeners instead of waking them all up on a shared socket.
+    """
     # Create socket
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, 'SO_REUSEPORT'):
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+    # Only wake up the accept loop once the client has sent data, saving a
+    # round of accept/recv syscalls per connection (Linux only).
+    if hasattr(socket, 'TCP_DEFER_ACCEPT'):
+        server_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_DEFER_ACCEPT, 1)
 
     # Bind the socket to a specific IP address and port
     server_socket.bind((config.BIND_ADDRESS, config.LISTENING_PORT))
 
-    # Enable SSL/TLS with the certificate and key files
-    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-    ssl_context.load_cert_chain(certfile=config.CERT_FILE, keyfile=config.KEY_FILE)
-
-    # Set the CA certificate file for client certificate verification
-    ssl_context.verify_mode = ssl.CERT_REQUIRED
-    ssl_context.load_verify_locations(cafile=config.CA_CERT_FILE)
-
     # Listen for incoming SSL/TLS connections
     ssl_server_socket = ssl_context.wrap_socket(server_socket, server_side=True)
 
-    # Listen for incoming connections
-    ssl_server_socket.listen(1)
+    # Listen for incoming connections. A full backlog lets the kernel queue
+    # bursts of connections instead of dropping them.
+    ssl_server_socket.listen(socket.SOMAXCONN)
 
     while True:
         # Accept a connection
         conn, addr = ssl_server_socket.accept()
 
-        # Handle the client connection in a separate function
-        handle_client_connection(conn, addr)
+        # Handle the client connection in a worker thread
+        EXECUTOR.submit(handle_client_connection, conn, addr)
+
+
+def start_listening(config):
+    """Opens the listening port and starts
+    For more info: see mai(), defaults.py, and config.yaml
+    Args:
+        config (config): An openme config object that holds info such as port number, binding addres, certificate file paths...
+    """
+
+    # Enable SSL/TLS with the certificate and key files
+    ssl_context = _build_ssl_context(config.CERT_FILE, config.KEY_FILE, config.CA_CERT_FILE)
+
+    # Start the worker that applies the queued iptables rules
+    threading.Thread(target=_rule_worker, daemon=True).start()
+
+    # One listener thread per CPU when SO_REUSEPORT can share the port,
+    # otherwise a single listener
+    listeners = (os.cpu_count() or 1) if hasattr(socket, 'SO_REUSEPORT') else 1
+    threads = []
+    for _ in range(listeners):
+        thread = threading.Thread(target=_accept_loop, args=(config, ssl_context), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
 
 
 def run_as_daemon(config):
@@ -227,14 +362,16 @@ def main():
     #Load config file
     config_file = args.config_file
     if not os.path.exists(config_file):
-        logger.error('Error: Config file "{}" not found. Using default config'.format(config_file))
+        logger.error('Error: Config file "%s" not found. Using default config', config_file)
+    if _YAML_LOADER is yaml.SafeLoader:
+        logger.warning('libyaml not available, parsing the config with the pure Python loader')
     try: 
         # TODO - command line argument
         # Load yaml config    
         # Open the YAML file and load its contents
         with open(config_file, 'r') as yaml_file:
             # Load YAML data from the file
-            user_config = yaml.safe_load(yaml_file)
+            user_config = yaml.load(yaml_file, Loader=_YAML_LOADER)
             logger.info(user_config)  # Print the loaded YAML data
     
             # Merge config imported from defaults with user_config
@@ -245,10 +382,13 @@ def main():
             # Validate config values are correct
             validate_config(config)
 
+            # Build the iptables payload templates for the merged config
+            precompute_rule_templates(config)
+
     except yaml.YAMLError as e:
-        logger.error(f"Error in config ({config_file}):", e)
+        logger.error("Error in config (%s): %s", config_file, e)
     except Exception as e:
-        logger.error(f"Config Error {str(e)}")
+        logger.error("Config Error %s", e)
         debug(traceback.print_exc())
         exit(1)
 
@@ -6,8 +6,7 @@ Each validator returns a tuple that is composed by
 a boolean indicating if the  passsed parameter is ok or not, 
 and a text message indicating what is the issue.
 """
-import os
-import re
+import functools
 import OpenSSL.crypto
 import logging
 
@@ -52,18 +51,43 @@ class InvalidCertificateError(Exception):
         super().__init__(self.message)
 
 
+@functools.lru_cache(maxsize=4096)
 def is_valid_ip4_address(ip_address):
     """Validate an IPv4 address
 
+    The result is cached: clients tend to retry with the same address, so
+    repeated validations become a dict lookup.
+
     Args:
         ip_address (string): IPv4 address to validate. Example: "192.168.1.1"
 
     Returns:
         bool: True if it is a valid address   
     """
-    # Validate the IP address format using regular expression
-    ip_regex= r'^((25[0-5]|(2[0-4]|1\d|[1-9]|)\d)\.?\b){4}$'
-    return bool(re.match(ip_regex, ip_address))
+    # Single pass over the string: accumulate each octet and reject
+    # non-digits, values over 255, leading zeros and wrong dot counts.
+    # Strict where inet_aton is permissive (short, octal and hex forms).
+    value = 0
+    digits = 0
+    dots = 0
+    for char in ip_address:
+        if char == '.':
+            if digits == 0 or dots == 3:
+                return False
+            value = 0
+            digits = 0
+            dots += 1
+        elif '0' <= char <= '9':
+            if digits and value == 0:
+                # Octets with a leading zero ("01") are not valid
+                return False
+            value = value * 10 + (ord(char) - 48)
+            digits += 1
+            if value > 255:
+                return False
+        else:
+            return False
+    return dots == 3 and digits > 0
 
 
 def is_valid_port_number(port_number):
@@ -76,7 +100,14 @@ def is_valid_port_number(port_number):
     Returns:
         bool: True if the port number is valid, False otherwise.
     """
-    return 0 < port_number <= 65535
+    # Exact int type check first so strings (and bools) never reach the
+    # comparison; the rest is two integer compares.
+    return type(port_number) is int and 0 < port_number <= 65535
+
+
+# Hoisted so the membership test is a hash lookup instead of building
+# and scanning a list per call
+_VALID_PROTOCOLS = frozenset(('tcp', 'udp'))
 
 
 def is_valid_protocol(protocol):
@@ -89,7 +120,7 @@ def is_valid_protocol(protocol):
     Returns:
         bool: True if the protocol is valid, False otherwise.
     """
-    return protocol.lower() in ['tcp', 'udp']
+    return protocol.lower() in _VALID_PROTOCOLS
 
 
 def validate_ports(ports_list):
@@ -106,14 +137,21 @@ def validate_ports(ports_list):
         InvalidPortNumber: If a port number is invalid or missing.
         InvalidProtocol: If a protocol is invalid or missing.
     """
+    # Direct subscription: the missing-key case is the exception, so it
+    # is handled as one instead of paying two .get calls per entry
     for port_info in ports_list:
-        port = port_info.get('port')
-        protocol = port_info.get('protocol')
-
-        if port is None or not is_valid_port_number(port):
+        try:
+            port = port_info['port']
+            protocol = port_info['protocol']
+        except KeyError as e:
+            if e.args[0] == 'port':
+                raise InvalidPortNumber("Invalid port number: None")
+            raise InvalidProtocol("Invalid protocol: None")
+
+        if not is_valid_port_number(port):
             raise InvalidPortNumber(f"Invalid port number: {port}")
 
-        if protocol is None or not is_valid_protocol(protocol):
+        if not is_valid_protocol(protocol):
             raise InvalidProtocol(f"Invalid protocol: {protocol}")
 
     return True
@@ -130,16 +168,17 @@ def validate_cert_file(cert_file):
         InvalidCertificateError: If the certificate file is not valid.
 
     Returns:
-        bool: True if the certificate file is valid, False otherwise.
+        X509: The parsed certificate, so callers can reuse it without
+        reading the file again.
     """
+    # One binary read, no separate existence check (open already reports
+    # a missing file, saving the extra stat)
     try:
-        if os.path.exists(cert_file):
-            with open(cert_file, 'rt') as f:
-                cert_data = f.read()
-                OpenSSL.crypto.load_certificate(OpenSSL.crypto.FILETYPE_PEM, cert_data)
-            return True
-        else:
-            raise InvalidCertificateError("Certificate file not found.")
+        with open(cert_file, 'rb') as f:
+            cert_data = f.read()
+        return OpenSSL.crypto.load_certificate(OpenSSL.crypto.FILETYPE_PEM, cert_data)
+    except FileNotFoundError:
+        raise InvalidCertificateError("Certificate file not found.")
     except Exception as e:
         raise InvalidCertificateError("Invalid certificate file: {}".format(str(e)))
 
@@ -167,46 +206,68 @@ def validate_key_file(key_file):
         InvalidKeyError: If the key file is not valid.
 
     Returns:
-        bool: True if the key file is valid, False otherwise.
+        PKey: The parsed private key, so callers can reuse it without
+        reading the file again.
     """
+    # One binary read, no separate existence check (open already reports
+    # a missing file, saving the extra stat)
     try:
-        if os.path.exists(key_file):
-            with open(key_file, 'rt') as f:
-                key_data = f.read()
-                OpenSSL.crypto.load_privatekey(OpenSSL.crypto.FILETYPE_PEM, key_data)
-            return True
-        else:
-            raise InvalidKeyError("Key file not found.")
+        with open(key_file, 'rb') as f:
+            key_data = f.read()
+        return OpenSSL.crypto.load_privatekey(OpenSSL.crypto.FILETYPE_PEM, key_data)
+    except FileNotFoundError:
+        raise InvalidKeyError("Key file not found.")
     except Exception as e:
         raise InvalidKeyError("Invalid key file: {}".format(str(e)))
 
 
 
+# Sentinel for config attributes that are not set. A single getattr with
+# a default replaces the hasattr/getattr pair (hasattr is a try/except
+# AttributeError underneath, doing the lookup twice).
+_MISSING = object()
+
+# Simple value checks, run table-driven from validate_config:
+# (attribute name, validator, error message)
+_CONFIG_CHECKS = (
+    # BIND_ADDRESS is a valid ip4 address
+    ('BIND_ADDRESS', is_valid_ip4_address,
+     "config: BIND_ADDRESS is not a valid IP address. Use something like 0.0.0.0 or 192.168.1.1"),
+    # LISTENING_PORT is between 1 and 65535
+    ('LISTENING_PORT', is_valid_port_number,
+     "Config: LISTENING_PORT is invalid. Port number must be between 1 and 65535"),
+)
+
+
 def validate_config(config):
     """
     Ensures that config parameters that appear are correct.
     """
     logger.debug(f'validate_config: {config}')
-    #BIND_ADDRESS  is a valid ip4 address
-    if hasattr(config, 'BIND_ADDRESS') and not is_valid_ip4_address(config.BIND_ADDRESS):
-        raise RuntimeError("config: BIND_ADDRESS is not a valid IP address. Use something like 0.0.0.0 or 192.168.1.1")
-    
-    #LISTENING_PORT  is between 1 and 65535 
-    if hasattr(config, 'LISTENING_PORT') and not is_valid_port_number(config.LISTENING_PORT):
-        raise RuntimeError("Config: LISTENING_PORT is invalid. Port number must be between 1 and 65535")
-    
-    #PORTS are between 1 and 65535 and protocol is tcp or udp f.i [(80,'tcp'),(443,'tcp')]
-    if hasattr(config,'PORTS'):
-        validate_ports(config.PORTS)
-    
-    # CERT_FILE exists and has the correct format
-    if hasattr(config,'CERT_FILE'):
-        validate_cert_file(config.CERT_FILE)
 
-    # KEY_FILE  exists and has a valid format 
-    if hasattr(config,'KEY_FILE'):
-        validate_key_file(config.KEY_FILE)
+    for name, check, message in _CONFIG_CHECKS:
+        value = getattr(config, name, _MISSING)
+        if value is not _MISSING and not check(value):
+            raise RuntimeError(message)
+
+    #PORTS are between 1 and 65535 and protocol is tcp or udp f.i [(80,'tcp'),(443,'tcp')]
+    ports = getattr(config, 'PORTS', _MISSING)
+    if ports is not _MISSING:
+        validate_ports(ports)
+
+    # CERT_FILE exists and has the correct format. The parsed objects are
+    # kept on the config so later TLS setup can reuse them instead of
+    # parsing the PEM files again.
+    cert_file = getattr(config, 'CERT_FILE', _MISSING)
+    if cert_file is not _MISSING:
+        config._parsed_cert = validate_cert_file(cert_file)
+
+    # KEY_FILE  exists and has a valid format
+    key_file = getattr(config, 'KEY_FILE', _MISSING)
+    if key_file is not _MISSING:
+        config._parsed_key = validate_key_file(key_file)
 
     # CA_CERT_FILE exists and has a valid format
-    if hasattr(config,'CA_CERT_FILE'):
-        validate_cert_file(config.CA_CERT_FILE)
+    ca_cert_file = getattr(config, 'CA_CERT_FILE', _MISSING)
+    if ca_cert_file is not _MISSING:
+        config._parsed_ca = validate_cert_file(ca_cert_file)
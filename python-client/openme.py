@@ -1,4 +1,5 @@
 import argparse
+import functools
 import ssl
 import socket
 import requests
@@ -8,24 +9,31 @@ import config
 
 import validators
 
+# Shared session so repeated calls reuse the TLS connection (keep-alive)
+_session = requests.Session()
+
+# Protocol byte strings, encoded once at import time
+_MSG_OPENME = b"OPEN ME"
+_MSG_MEOPEN = b"MEOPEN"
+_OK = b"OK"
+_KO = b"KO"
+
 def get_public_ip_details():
     """
     Get the public IP address and its details using the ipinfo.io API.
-    
+
     Returns:
-        tuple: A tuple containing public IP address (str) and its details (dict).
+        dict: The details of the public IP address.
     """
-    # Sending a GET request to ipinfo.io/ip to get the public IP address
-    response1 = requests.get("https://ipinfo.io/ip")
-    public_ip_address = response1.text.strip()
+    # One GET to ipinfo.io/json returns the public IP and its details in
+    # a single round trip (the old two-call version paid a second TLS
+    # handshake just to learn the IP the response already contains)
+    response = _session.get("https://ipinfo.io/json", timeout=5)
+    ip_details = response.json()
 
     # Ensure the ip address returned is an actual IP
-    if not validators.is_valid_ip4_address(public_ip_address):
+    if not validators.is_valid_ip4_address(ip_details.get("ip", "")):
         raise AttributeError("Incorrect IP address format returned by ipinfo.io")
-    
-    # Sending a GET request to ipinfo.io/<public_ip_address> to get the details of the specified IP address
-    response2 = requests.get(f"https://ipinfo.io/{public_ip_address}")
-    ip_details = response2.json()
 
     return ip_details
 
@@ -64,53 +72,69 @@ epilog='''Examples:
         python openme.py -e
 '''
 
-# Parse command-line arguments
-parser = argparse.ArgumentParser(description="Client for openme",
-                                 epilog=epilog,
-                                 formatter_class=argparse.RawDescriptionHelpFormatter
-                                 )
-parser.add_argument("-s", "--server", default=config.DEFAULT_SERVER, help="Server address")
-parser.add_argument("-p", "--port", type=int, default=config.DEFAULT_PORT, help="Server port (default:54154)")
-parser.add_argument("-i", "--ip-address", help="Open/Close ports to this IP address (default: MY current public IP)")
-parser.add_argument("-o", "--openme", action="store_true", default=False, help="Open ports (aka openme)")
-parser.add_argument("-m", "--miopen", action="store_true", default=False, help="Close ports (aka miopen)")
-parser.add_argument("-e", "--me", action="store_true", default=False, help="Displays your current public IP info (uses ipinfo.io API)")
-
-args = parser.parse_args()
-
-# Connect to the server using SSL
-# TODO
-#context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-
-# If none of these flags are set, display the help and leave
-if not args.me or args.openme or args.miopen:
-    parser.print_help()
-    exit()
-
-# Display ip info
-if args.me:
-    display_ip_details() 
-
-# Open or close ports
-if args.openme or args.miopen:
-    # Load certs
+@functools.lru_cache(maxsize=8)
+def get_context(cert, key, ca):
+    """
+    Builds the client SSL context. Cached so repeated calls (e.g. when
+    knocking several servers from the same process) do not re-parse the
+    PEM files and re-initialize OpenSSL state.
+    """
     context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-    context.load_cert_chain(certfile=config.CLIENT_CERT, keyfile=config.CLIENT_KEY)
-    context.load_verify_locations(cafile=config.CA_CERT)
-
-    with socket.create_connection((args.server, args.port)) as sock:
-        with context.wrap_socket(sock, server_hostname=args.server) as secure_sock:
-            if args.miopen:
-                message = "MEOPEN" if args.ip_address is None else f"MIOPEN {args.ip_address}"
-            else: 
-                message = "OPEN ME" if args.ip_address is None else f"OPEN {args.ip_address}"
-            secure_sock.sendall(message.encode())
-            
-            # Receive and handle server response
-            response = secure_sock.recv(1024).decode()
-            if response == "OK":
-                print("Server response: OK")
-            elif response == "KO":
-                print("Server response: KO (error)")
-            else:
-                print("Unexpected server response:", response)        
\ No newline at end of file
+    context.load_cert_chain(certfile=cert, keyfile=key)
+    context.load_verify_locations(cafile=ca)
+    return context
+
+
+def main():
+    # Parse command-line arguments
+    parser = argparse.ArgumentParser(description="Client for openme",
+                                     epilog=epilog,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter
+                                     )
+    parser.add_argument("-s", "--server", default=config.DEFAULT_SERVER, help="Server address")
+    parser.add_argument("-p", "--port", type=int, default=config.DEFAULT_PORT, help="Server port (default:54154)")
+    parser.add_argument("-i", "--ip-address", help="Open/Close ports to this IP address (default: MY current public IP)")
+    parser.add_argument("-o", "--openme", action="store_true", default=False, help="Open ports (aka openme)")
+    parser.add_argument("-m", "--miopen", action="store_true", default=False, help="Close ports (aka miopen)")
+    parser.add_argument("-e", "--me", action="store_true", default=False, help="Displays your current public IP info (uses ipinfo.io API)")
+
+    args = parser.parse_args()
+
+    # If none of these flags are set, display the help and leave
+    if not (args.me or args.openme or args.miopen):
+        parser.print_help()
+        return
+
+    # Display ip info
+    if args.me:
+        display_ip_details()
+
+    # Open or close ports
+    if args.openme or args.miopen:
+        # Load certs
+        context = get_context(config.CLIENT_CERT, config.CLIENT_KEY, config.CA_CERT)
+
+        with socket.create_connection((args.server, args.port)) as sock:
+            with context.wrap_socket(sock, server_hostname=args.server) as secure_sock:
+                if args.miopen:
+                    message = _MSG_MEOPEN if args.ip_address is None else b"MEOPEN " + args.ip_address.encode('ascii')
+                else:
+                    message = _MSG_OPENME if args.ip_address is None else b"OPEN " + args.ip_address.encode('ascii')
+                secure_sock.sendall(message)
+
+                # Receive the server response into a small preallocated
+                # buffer; the OK/KO comparison needs no decode
+                buffer = bytearray(16)
+                count = secure_sock.recv_into(buffer)
+                response = bytes(buffer[:count])
+                if response == _OK:
+                    print("Server response: OK")
+                elif response == _KO:
+                    print("Server response: KO (error)")
+                else:
+                    print("Unexpected server response:", response)
+                return response
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
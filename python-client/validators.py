@@ -1,4 +1,9 @@
-import re 
+import socket
+
+# Hoisted so each call goes straight to the C parser without the two
+# socket module attribute lookups
+_inet_pton = socket.inet_pton
+_AF_INET = socket.AF_INET
 
 def is_valid_ip4_address(ip_address):
     """Validate an IPv4 address
@@ -7,9 +12,13 @@ def is_valid_ip4_address(ip_address):
         ip_address (string): IPv4 address to validate. Example: "192.168.1.1"
 
     Returns:
-        bool: True if it is a valid address   
+        bool: True if it is a valid address
     """
-    # Validate the IP address format using regular expression
-    ip_regex= r'^((25[0-5]|(2[0-4]|1\d|[1-9]|)\d)\.?\b){4}$'
-    return bool(re.match(ip_regex, ip_address))
-
+    # inet_pton only accepts the strict dotted-quad form, so the libc
+    # parser does the work and octets over 255 are rejected (the old
+    # regex let "123.456.789.0" through).
+    try:
+        _inet_pton(_AF_INET, ip_address)
+        return True
+    except (OSError, TypeError):
+        return False